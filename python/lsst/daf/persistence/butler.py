@@ -25,8 +25,15 @@
 # -*- python -*-
 
 """This module defines the Butler class."""
-import copy
+import bisect
+import collections
+import concurrent.futures
+import functools
 import inspect
+import itertools
+import re
+import sys
+import weakref
 
 import yaml
 
@@ -44,6 +51,109 @@ preinitedMapperWarning = ("Passing an instantiated mapper into "
                           "It is better to pass a importable string or "
                           "class object.")
 
+# Valid values of RepoData origin and role.
+_VALID_ORIGINS = frozenset(('new', 'existing', 'nested'))
+_VALID_ROLES = frozenset(('input', 'output', 'parent'))
+
+# The mode to use for an input for each allowed value of the mode in its RepositoryArgs.
+_INPUT_MODES = {None: 'r', 'r': 'r', 'rw': 'r'}
+
+# The maximum number of threads used to read the RepositoryCfgs of a repository's parents.
+_MAX_CFG_READ_THREADS = 16
+
+# The maximum number of read locations cached by each Butler, see `Butler._locate`.
+_LOCATION_CACHE_SIZE = 1024
+_NO_TAGS = frozenset()
+
+
+@functools.lru_cache(maxsize=1)
+def _getButlerLog():
+    """Get the log used by all Butler instances; it is looked up once, on first use."""
+    return Log.getLogger("daf.persistence.butler")
+
+
+# The bypass dataset types of each mapper class, see `_bypassTypes`. The classes are weakly referenced so
+# that the cache does not keep them alive.
+_bypassTypesCache = weakref.WeakKeyDictionary()
+
+
+def _bypassTypes(mapperClass):
+    """Get the dataset types that a mapper class has bypass functions for.
+
+    The result is cached per class, and found again when an attribute is added to or removed from the class
+    or one of its bases.
+
+    Parameters
+    ----------
+    mapperClass : class
+        A mapper class.
+
+    Returns
+    -------
+    frozenset of string, or None
+        The dataset types of the bypass_<datasetType> attributes of the class, or None if the class
+        customizes attribute lookup (with __getattr__ or __getattribute__), so that its bypass functions
+        cannot be known from its attributes.
+    """
+    mro = inspect.getmro(mapperClass)
+    stamp = tuple(len(vars(cls)) for cls in mro)
+    entry = _bypassTypesCache.get(mapperClass)
+    if entry is None or entry[0] != stamp:
+        if any('__getattr__' in vars(cls) or '__getattribute__' in vars(cls) for cls in mro[:-1]):
+            types = None
+        else:
+            types = frozenset(name[len("bypass_"):] for name in dir(mapperClass)
+                              if name.startswith("bypass_"))
+        entry = (stamp, types)
+        _bypassTypesCache[mapperClass] = entry
+    return entry[1]
+
+
+def _findBypassFunc(mapper, datasetType, bypassName):
+    """Get a mapper's bypass function for a dataset type.
+
+    Mappers may add bypass functions to their instances, so those are looked for in the instance first;
+    the bypass functions of the mapper's class are only looked up when the class is known to have one, or
+    when it customizes attribute lookup.
+
+    Parameters
+    ----------
+    mapper : Mapper instance
+        The mapper to get the bypass_<datasetType> function of.
+    datasetType : string
+        The dataset type.
+    bypassName : string
+        "bypass_" + datasetType.
+
+    Returns
+    -------
+    The bypass function, or None if the mapper does not have one for the dataset type.
+    """
+    bypassFunc = getattr(mapper, "__dict__", {}).get(bypassName)
+    if bypassFunc is None:
+        types = _bypassTypes(type(mapper))
+        if types is None or datasetType in types:
+            bypassFunc = getattr(mapper, bypassName, None)
+    return bypassFunc
+
+
+def _isPlainData(obj):
+    """Test if an object is made only of builtin scalars, lists, tuples and dicts (with string keys), so that
+    its repr identifies its value."""
+    if obj is None or type(obj) in (bool, int, float, str):
+        return True
+    if type(obj) in (list, tuple):
+        return all(_isPlainData(item) for item in obj)
+    if type(obj) is dict:
+        return all(type(key) is str and _isPlainData(val) for key, val in obj.items())
+    return False
+
+
+def _isMapperInstance(mapper):
+    """Test if a mapper (as given in RepositoryArgs or a RepositoryCfg) is a mapper instance, rather than
+    None, the name of a mapper class or a mapper class."""
+    return mapper is not None and not isinstance(mapper, str) and not inspect.isclass(mapper)
+
 
 class ButlerCfg(Policy, yaml.YAMLObject):
     """Represents a Butler configuration.
@@ -56,7 +166,10 @@ class ButlerCfg(Policy, yaml.YAMLObject):
     yaml_tag = u"!ButlerCfg"
 
     def __init__(self, cls, repoCfg):
-        super().__init__({'repoCfg': repoCfg, 'cls': cls})
+        super().__init__()
+        # This dict is not shared with the caller, so it can be used as the data directly instead of being
+        # walked and copied by Policy.update.
+        self.data = {'repoCfg': repoCfg, 'cls': cls}
 
 
 class RepoData:
@@ -124,6 +237,7 @@ class RepoData:
         self.cfgRoot = None
         self.repo = None
         self.parentRepoDatas = []
+        self._flatParents = None
         self.isV1Repository = False
         self.tags = set()
         self.role = role
@@ -177,11 +291,11 @@ class RepoData:
         -------
         None
         """
-        if origin not in ('new', 'existing', 'nested'):
+        if origin not in _VALID_ORIGINS:
             raise RuntimeError("Invalid value for origin:{}".format(origin))
         self.cfg = cfg
         self._cfgOrigin = origin
-        self.cfgRoot = root
+        self.cfgRoot = sys.intern(root) if type(root) is str else root
         self.isV1Repository = isV1Repository
 
     @property
@@ -198,7 +312,7 @@ class RepoData:
 
     @role.setter
     def role(self, val):
-        if val not in ('input', 'output', 'parent'):
+        if val not in _VALID_ROLES:
             raise RuntimeError("Invalid value for role: {}".format(val))
         self._role = val
 
@@ -208,11 +322,15 @@ class RepoData:
         Duplicate entries will be removed in cases where the same parent appears more than once in the parent
         graph.
 
+        The result of a call made with the default context is cached, and is discarded when a parent is added
+        to this RepoData. (Butler connects all the parent RepoDatas before this is called.)
+
         Parameters
         ----------
         context : set, optional
-            Users should typically omit context and accept the default argument. Context is used to keep a set
-            of known RepoDatas when calling this function recursively, for duplicate elimination.
+            Users should typically omit context and accept the default argument. Context is a set of the id of
+            known RepoDatas, which will be excluded from the results and is updated with the id of each
+            RepoData that is returned.
 
         Returns
         -------
@@ -220,21 +338,33 @@ class RepoData:
             A list of the parents & grandparents etc of a given repo data, in depth-first search order.
         """
         if context is None:
-            context = set()
+            if self._flatParents is None:
+                self._flatParents = self._findParentRepoDatas(set())
+            return list(self._flatParents)
+        return self._findParentRepoDatas(context)
+
+    def _findParentRepoDatas(self, context):
+        """Walk the parent graph depth-first, see `getParentRepoDatas`."""
         parents = []
         if id(self) in context:
             return parents
         context.add(id(self))
-        for parent in self.parentRepoDatas:
-            parents.append(parent)
-            parents += parent.getParentRepoDatas(context)
+        stack = list(reversed(self.parentRepoDatas))
+        while stack:
+            repoData = stack.pop()
+            if id(repoData) in context:
+                continue
+            context.add(id(repoData))
+            parents.append(repoData)
+            stack.extend(reversed(repoData.parentRepoDatas))
         return parents
 
     def addParentRepoData(self, parentRepoData):
         self.parentRepoDatas.append(parentRepoData)
+        self._flatParents = None
 
     def addTags(self, tags):
-        self.tags = self.tags.union(tags)
+        self.tags.update(tags)
 
 
 class RepoDataContainer:
@@ -250,39 +380,38 @@ class RepoDataContainer:
         self._inputs = None
         self._outputs = None
         self._all = repoDataList
-        self._buildLookupLists()
 
     def inputs(self):
         """Get a list of RepoData that are used to as inputs to the Butler.
-        The list is created lazily as needed, and cached.
+        The list is created lazily as needed, and cached as a tuple so that it can be shared by every call.
 
         Returns
         -------
-        A list of RepoData with readable repositories, in the order to be used when searching.
+        A tuple of RepoData with readable repositories, in the order to be used when searching.
         """
         if self._inputs is None:
-            raise RuntimeError("Inputs not yet initialized.")
+            self._inputs = tuple(self._buildInputs())
         return self._inputs
 
     def outputs(self):
         """Get a list of RepoData that are used to as outputs to the Butler.
-        The list is created lazily as needed, and cached.
+        The list is created lazily as needed, and cached as a tuple so that it can be shared by every call.
 
         Returns
         -------
-        A list of RepoData with writable repositories, in the order to be use when searching.
+        A tuple of RepoData with writable repositories, in the order to be use when searching.
         """
         if self._outputs is None:
-            raise RuntimeError("Outputs not yet initialized.")
+            self._outputs = tuple(repoData.repoData for repoData in self.all() if repoData.role == 'output')
         return self._outputs
 
     def all(self):
         """Get a list of all RepoData that are used to as by the Butler.
-        The list is created lazily as needed, and cached.
 
         Returns
         -------
-        A list of RepoData with writable repositories, in the order to be use when searching.
+        A list of all the RepoData (outputs, inputs, and their parents), each one once, in the order the
+        Butler found them; outputs first, each readable RepoData followed by its parents.
         """
         return self._all
 
@@ -293,30 +422,29 @@ class RepoDataContainer:
             self._outputs,
             self._all)
 
-    def _buildLookupLists(self):
-        """Build the inputs and outputs lists based on the order of self.all()."""
+    def _buildInputs(self):
+        """Build the inputs list based on the order of self.all()."""
 
         def addToList(repoData, lst):
             """Add a repoData and each of its parents (depth first) to a list"""
-            if id(repoData) in alreadyAdded:
-                return
-            lst.append(repoData)
-            alreadyAdded.add(id(repoData))
-            for parent in repoData.parentRepoDatas:
-                addToList(parent, lst)
-
-        if self._inputs is not None or self._outputs is not None:
-            raise RuntimeError("Lookup lists are already built.")
-        inputs = [repoData for repoData in self.all() if repoData.role == 'input']
-        outputs = [repoData for repoData in self.all() if repoData.role == 'output']
-        self._inputs = []
+            stack = [repoData]
+            while stack:
+                repoData = stack.pop()
+                if id(repoData) in alreadyAdded:
+                    continue
+                lst.append(repoData)
+                alreadyAdded.add(id(repoData))
+                stack.extend(reversed(repoData.parentRepoDatas))
+
+        inputs = []
         alreadyAdded = set()
-        for repoData in outputs:
-            if 'r' in repoData.repoArgs.mode:
-                addToList(repoData.repoData, self._inputs)
-        for repoData in inputs:
-            addToList(repoData.repoData, self._inputs)
-        self._outputs = [repoData.repoData for repoData in outputs]
+        for repoData in self.all():
+            if repoData.role == 'output' and 'r' in repoData.repoArgs.mode:
+                addToList(repoData.repoData, inputs)
+        for repoData in self.all():
+            if repoData.role == 'input':
+                addToList(repoData.repoData, inputs)
+        return inputs
 
 
 @deprecate_class
@@ -359,6 +487,10 @@ class Butler:
 
     put(self, obj, datasetType, dataId={}, **rest)
 
+    getAll(self, datasetType, dataIds, immediate=True)
+
+    putAll(self, objs, datasetType, dataIds, doBackup=False)
+
     subset(self, datasetType, level=None, dataId={}, **rest)
 
     dataRef(self, datasetType, level=None, dataId={}, **rest)
@@ -504,11 +636,18 @@ class Butler:
     """This is a Generation 2 Butler.
     """
 
+    _repositoryCache = {}
+    """Repositories that may be shared by all the Butlers in this process, see `_getRepository`. The values
+    are (weak reference to the Repository, parent registry it was made with).
+    """
+
     def __init__(self, root=None, mapper=None, inputs=None, outputs=None, **mapperArgs):
         self._initArgs = {'root': root, 'mapper': mapper, 'inputs': inputs, 'outputs': outputs,
                           'mapperArgs': mapperArgs}
 
-        self.log = Log.getLogger("daf.persistence.butler")
+        self.log = _getButlerLog()
+
+        self._locationCache = collections.OrderedDict()
 
         inputs, outputs = self._processInputArguments(
             root=root, mapper=mapper, inputs=inputs, outputs=outputs, **mapperArgs)
@@ -549,7 +688,60 @@ class Butler:
             repoData.parentRegistry = parentRegistry if parentRegistry else parentRepoData.parentRegistry
             if repoData.parentRegistry:
                 break
-        repoData.repo = Repository(repoData)
+        repoData.repo = self._getRepository(repoData)
+
+    @staticmethod
+    def _getRepository(repoData):
+        """Get the Repository for a RepoData.
+
+        A Repository (and its mapper) may be shared by all the Butlers in this process that use the same
+        repository, instead of each Butler instantiating its own. Note that this means that state the mapper
+        keeps (e.g. its registry and caches) is shared by those Butlers too. Sharing is limited to
+        repositories that:
+
+        - are opened read-only, and were loaded from an existing persisted RepositoryCfg that has not changed
+          on disk or in memory,
+        - are not Old Butler (V1) repositories,
+        - were not given a mapper instance (in their RepositoryArgs or their cfg); a mapper instance belongs
+          to the code that passed it in,
+        - have mapperArgs made only of builtin types, so that the repr of the cfg identifies it,
+        - were given the same parent registry object.
+
+        Every other repository gets a new Repository.
+
+        Parameters
+        ----------
+        repoData : RepoData
+            The RepoData to get a Repository for. Its parentRegistry must already be set.
+
+        Returns
+        -------
+        Repository
+            The Repository to use for repoData.
+        """
+        if (repoData.cfgOrigin != 'existing' or repoData.cfg.dirty or repoData.isV1Repository
+                or 'w' in repoData.repoArgs.mode
+                or _isMapperInstance(repoData.repoArgs.mapper) or _isMapperInstance(repoData.cfg.mapper)
+                or not _isPlainData(repoData.cfg.mapperArgs)):
+            return Repository(repoData)
+        stamp = Storage.getRepositoryCfgStamp(repoData.cfgRoot)
+        if stamp is None:
+            return Repository(repoData)
+        # The cache entry keeps the parent registry, so its id can not be reused by another object while the
+        # entry exists; it is also compared by identity.
+        key = (repoData.cfgRoot, stamp, repr(repoData.cfg), id(repoData.parentRegistry))
+        cache = Butler._repositoryCache
+        entry = cache.get(key)
+        repo = entry[0]() if entry is not None and entry[1] is repoData.parentRegistry else None
+        if repo is None:
+            repo = Repository(repoData)
+
+            def removeEntry(ref, key=key):
+                # remove the entry when its Repository is garbage collected, unless it was replaced.
+                if cache.get(key, (None, None))[0] is ref:
+                    cache.pop(key, None)
+            cache[key] = (weakref.ref(repo, removeEntry), repoData.parentRegistry)
+        return repo
 
     def _processInputArguments(self, root=None, mapper=None, inputs=None, outputs=None, **mapperArgs):
         """Process, verify, and standardize the input arguments.
@@ -585,10 +777,6 @@ class Butler:
             If Old Butler and New Butler arguments are both used this will raise.
             If an output is readable there is more than one output this will raise.
         """
-        # inputs and outputs may be modified, do not change the external value.
-        inputs = copy.deepcopy(inputs)
-        outputs = copy.deepcopy(outputs)
-
         isV1Args = inputs is None and outputs is None
         if isV1Args:
             inputs, outputs = self._convertV1Args(root=root,
@@ -599,32 +787,42 @@ class Butler:
                 'Butler version 1 API (root, mapper, **mapperArgs) may '
                 'not be used with version 2 API (inputs, outputs)')
         self.datasetTypeAliasDict = {}
+        # resolved datasetTypes by aliased datasetType, for self._datasetTypeAliasCacheDict.
+        self._datasetTypeAliasCache = {}
+        self._datasetTypeAliasCacheDict = self.datasetTypeAliasDict
+        self._datasetTypeAliasPattern = None
+        # a copy of the aliases that self._datasetTypeAliasCache and self._datasetTypeAliasPattern were made
+        # from.
+        self._datasetTypeAliasSnapshot = {}
+        self._sortedAliases = []
+        self._sortedAliasesDict = self.datasetTypeAliasDict
 
         self.storage = Storage()
 
         # make sure inputs and outputs are lists, and if list items are a string convert it RepositoryArgs.
-        inputs = listify(inputs)
-        outputs = listify(outputs)
-        inputs = [RepositoryArgs(cfgRoot=args)
-                  if not isinstance(args, RepositoryArgs) else args for args in inputs]
-        outputs = [RepositoryArgs(cfgRoot=args)
-                   if not isinstance(args, RepositoryArgs) else args for args in outputs]
+        # RepositoryArgs may be modified, copy them so as to not change the external value.
+        def toRepositoryArgsList(argsList):
+            # lists and tuples (the common case) are not copied by listify because a new list is made here.
+            if type(argsList) is not list and type(argsList) is not tuple:
+                argsList = listify(argsList)
+            return [args.copy() if isinstance(args, RepositoryArgs) else RepositoryArgs(cfgRoot=args)
+                    for args in argsList]
+        inputs = toRepositoryArgsList(inputs)
+        outputs = toRepositoryArgsList(outputs)
         # Set the default value of inputs & outputs, verify the required values ('r' for inputs, 'w' for
         # outputs) and remove the 'w' from inputs if needed.
         for args in inputs:
-            if args.mode is None:
-                args.mode = 'r'
-            elif 'rw' == args.mode:
-                args.mode = 'r'
-            elif 'r' != args.mode:
+            mode = _INPUT_MODES.get(args.mode)
+            if mode is None:
                 raise RuntimeError("The mode of an input should be readable.")
+            args.mode = mode
         for args in outputs:
             if args.mode is None:
                 args.mode = 'w'
             elif 'w' not in args.mode:
                 raise RuntimeError("The mode of an output should be writable.")
         # check for class instances in args.mapper (not allowed)
-        for args in inputs + outputs:
+        for args in itertools.chain(inputs, outputs):
             if (args.mapper and not isinstance(args.mapper, str)
                and not inspect.isclass(args.mapper)):
                 self.log.warn(preinitedMapperWarning)
@@ -665,19 +863,6 @@ class Butler:
         else:
             return repoData.cfg.root
 
-    @staticmethod
-    def _getParents(ofRepoData, repoInfo):
-        """Create a parents list of repoData from inputs and (readable) outputs."""
-        parents = []
-        # get the parents list of repoData:
-        for repoData in repoInfo:
-            if repoData is ofRepoData:
-                continue
-            if 'r' not in repoData.repoArgs.mode:
-                continue
-            parents.append(Butler._getParentVal(repoData))
-        return parents
-
     @staticmethod
     def _getOldButlerRepositoryCfg(repositoryArgs):
         if not Storage.isPosix(repositoryArgs.cfgRoot):
@@ -720,6 +905,29 @@ class Butler:
                 isOldButlerRepository = True
         return cfg, isOldButlerRepository
 
+    def _getRepositoryCfgs(self, uris):
+        """Get the repositories at several locations, see `_getRepositoryCfg`.
+
+        When there is more than one location the cfgs are read concurrently, so that the latency of reading
+        them from a slow (e.g. networked) filesystem is not paid once per location.
+
+        Parameters
+        ----------
+        uris : list of string
+            The URIs of the locations of the cfgs.
+
+        Returns
+        -------
+        dict
+            For each URI, the (RepositoryCfg or None, bool) tuple returned by `_getRepositoryCfg`.
+        """
+        uris = list(dict.fromkeys(uris))
+        if len(uris) < 2:
+            return {uri: self._getRepositoryCfg(uri) for uri in uris}
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(_MAX_CFG_READ_THREADS, len(uris))) as executor:
+            return dict(zip(uris, executor.map(self._getRepositoryCfg, uris)))
+
     def _getCfgs(self, repoDataList):
         """Get or make a RepositoryCfg for each RepoData, and add the cfg to the RepoData.
         If the cfg exists, compare values. If values match then use the cfg as an "existing" cfg. If the
@@ -812,40 +1020,49 @@ class Butler:
         RuntimeError
             Raised if a RepositoryCfg can not be found at a location where a parent repository should be.
         """
-        repoDataIdx = 0
-        while True:
-            if repoDataIdx == len(repoDataList):
-                break
-            repoData = repoDataList[repoDataIdx]
+        # The RepoDatas that have not been checked yet are kept in a deque; the parents of a RepoData are
+        # inserted at the front of it, which is cheap, instead of in the middle of repoDataList.
+        pending = collections.deque(repoDataList)
+        del repoDataList[:]
+        # The readable RepoDatas already in repoDataList by cfg root; a parent that is one of these (e.g. the
+        # common ancestor of two inputs) already has its parents after it and is not added (or walked) again.
+        placedByRoot = {}
+        while pending:
+            repoData = pending.popleft()
+            repoDataList.append(repoData)
             if 'r' not in repoData.repoArgs.mode:
-                repoDataIdx += 1
                 continue  # the repoData only needs parents if it's readable.
+            placedByRoot.setdefault(repoData.cfg.root, []).append(repoData)
             if repoData.isNewRepository:
-                repoDataIdx += 1
                 continue  # if it's new the parents will be the inputs of this butler.
-            if repoData.cfg.parents is None:
-                repoDataIdx += 1
+            # cfg.parents makes a new list of denormalized parents each time it is used; get it once.
+            repoParents = repoData.cfg.parents
+            if repoParents is None:
                 continue  # if there are no parents then there's nothing to do.
-            for repoParentIdx, repoParent in enumerate(repoData.cfg.parents):
-                parentIdxInRepoDataList = repoDataIdx + repoParentIdx + 1
+            parentCfgs = self._getRepositoryCfgs([repoParent for repoParent in repoParents
+                                                  if not isinstance(repoParent, RepositoryCfg)])
+            insertIdx = 0
+            for repoParent in repoParents:
                 if not isinstance(repoParent, RepositoryCfg):
-                    repoParentCfg, isOldButlerRepository = self._getRepositoryCfg(repoParent)
+                    repoParentCfg, isOldButlerRepository = parentCfgs[repoParent]
                     if repoParentCfg is not None:
                         cfgOrigin = 'existing'
                 else:
                     isOldButlerRepository = False
                     repoParentCfg = repoParent
                     cfgOrigin = 'nested'
-                if (parentIdxInRepoDataList < len(repoDataList)
-                        and repoDataList[parentIdxInRepoDataList].cfg == repoParentCfg):
+                if insertIdx < len(pending) and pending[insertIdx].cfg == repoParentCfg:
+                    insertIdx += 1
+                    continue
+                if any(placed.cfg == repoParentCfg for placed in placedByRoot.get(repoParentCfg.root, ())):
                     continue
                 args = RepositoryArgs(cfgRoot=repoParentCfg.root, mode='r')
                 role = 'input' if repoData.role == 'output' else 'parent'
                 newRepoInfo = RepoData(args, role)
                 newRepoInfo.repoData.setCfg(cfg=repoParentCfg, origin=cfgOrigin, root=args.cfgRoot,
                                             isV1Repository=isOldButlerRepository)
-                repoDataList.insert(parentIdxInRepoDataList, newRepoInfo)
-            repoDataIdx += 1
+                pending.insert(insertIdx, newRepoInfo)
+                insertIdx += 1
 
     def _setAndVerifyParentsLists(self, repoDataList):
         """Make a list of all the input repositories of this Butler, these are the parents of the outputs.
@@ -863,28 +1080,16 @@ class Butler:
             If an existing output repository is loaded and its parents do not match the parents of this Butler
             an error will be raised.
         """
-        def getIOParents(ofRepoData, repoDataList):
-            """make a parents list for repo in `ofRepoData` that is comprised of inputs and readable
-            outputs (not parents-of-parents) of this butler"""
-            parents = []
-            for repoData in repoDataList:
-                if repoData.role == 'parent':
-                    continue
-                if repoData is ofRepoData:
-                    continue
-                if repoData.role == 'output':
-                    if 'r' in repoData.repoArgs.mode:
-                        raise RuntimeError("If an output is readable it must be the only output.")
-                        # and if this is the only output, this should have continued in
-                        # "if repoData is ofRepoData"
-                    continue
-                parents.append(self._getParentVal(repoData))
-            return parents
+        outputs = [repoData for repoData in repoDataList if repoData.role == 'output']
+        if len(outputs) > 1 and any('r' in repoData.repoArgs.mode for repoData in outputs):
+            raise RuntimeError("If an output is readable it must be the only output.")
+        # The parents of each output are the inputs (not parents-of-parents) of this butler. This is the same
+        # list for every output; the readable output, if there is one, is the only output.
+        ioParents = [self._getParentVal(repoData) for repoData in repoDataList if repoData.role == 'input']
 
-        for repoData in repoDataList:
-            if repoData.role != 'output':
-                continue
-            parents = getIOParents(repoData, repoDataList)
+        for repoData in outputs:
+            # the cfg may modify the list it is passed, give each output its own copy.
+            parents = list(ioParents)
             # if repoData is new, add the parent RepositoryCfgs to it.
             if repoData.cfgOrigin == 'new':
                 repoData.cfg.addParents(parents)
@@ -940,24 +1145,36 @@ class Butler:
             When a parent is listed in the parents list but not found in the repoDataList. This is not
             expected to ever happen and would indicate an internal Butler error.
         """
+        repoDatasByRoot = self._indexRepoDatasByRoot(repoDataList)
         for repoData in repoDataList:
             for parent in repoData.cfg.parents:
-                parentToAdd = None
-                for otherRepoData in repoDataList:
-                    if isinstance(parent, RepositoryCfg):
-                        if otherRepoData.repoData.repoData.cfg == parent:
-                            parentToAdd = otherRepoData.repoData
-                            break
-                    elif otherRepoData.repoData.cfg.root == parent:
-                        parentToAdd = otherRepoData.repoData
-                        break
+                parentToAdd = self._getParentRepoData(parent, repoDataList, repoDatasByRoot)
                 if parentToAdd is None:
                     raise RuntimeError(
                         "Could not find a parent matching {} to add to {}".format(parent, repoData))
                 repoData.addParentRepoData(parentToAdd)
 
     @staticmethod
-    def _getParentRepoData(parent, repoDataList):
+    def _indexRepoDatasByRoot(repoDataList):
+        """Make a dict of the RepoDatas in a list by the root of their cfg, for `_getParentRepoData`.
+
+        Parameters
+        ----------
+        repoDataList : list of RepoData
+            The RepoDatas to index.
+
+        Returns
+        -------
+        dict
+            For each cfg root, the list of RepoDatas with that root, in the order they are in repoDataList.
+        """
+        repoDatasByRoot = {}
+        for repoData in repoDataList:
+            repoDatasByRoot.setdefault(repoData.repoData.cfg.root, []).append(repoData.repoData)
+        return repoDatasByRoot
+
+    @staticmethod
+    def _getParentRepoData(parent, repoDataList, repoDatasByRoot=None):
         """get a parent RepoData from a cfg from a list of RepoData
 
         Parameters
@@ -966,35 +1183,37 @@ class Butler:
             cfgRoot of a repo or a cfg that describes the repo
         repoDataList : list of RepoData
             list to search in
+        repoDatasByRoot : dict, optional
+            The result of `_indexRepoDatasByRoot` for repoDataList, if the caller has it.
 
         Returns
         -------
         RepoData or None
             A RepoData if one can be found, else None
         """
-        repoData = None
-        for otherRepoData in repoDataList:
-            if isinstance(parent, RepositoryCfg):
+        if repoDatasByRoot is None:
+            repoDatasByRoot = Butler._indexRepoDatasByRoot(repoDataList)
+        # Equal cfgs have equal roots, so only the RepoDatas with the parent's root need to be checked.
+        if isinstance(parent, RepositoryCfg):
+            for otherRepoData in repoDatasByRoot.get(parent.root, ()):
                 if otherRepoData.cfg == parent:
-                    repoData = otherRepoData
-                    break
-            elif otherRepoData.cfg.root == parent:
-                repoData = otherRepoData
-                break
-        return repoData
+                    return otherRepoData
+            return None
+        candidates = repoDatasByRoot.get(parent)
+        return candidates[0] if candidates else None
 
     def _setRepoDataTags(self):
         """Set the tags from each repoArgs into all its parent repoArgs so that they can be included in tagged
         searches."""
-        def setTags(repoData, tags, context):
-            if id(repoData) in context:
-                return
-            repoData.addTags(tags)
-            context.add(id(repoData))
-            for parentRepoData in repoData.parentRepoDatas:
-                setTags(parentRepoData, tags, context)
-        for repoData in self._repos.outputs() + self._repos.inputs():
-            setTags(repoData.repoData, repoData.repoArgs.tags, set())
+        # Every RepoData is in all(), and adding tags does not depend on order, so the (lazily built) lookup
+        # lists are not needed here. getParentRepoDatas walks the parents without recursion and visits each
+        # one once, even if it is shared by several parents.
+        for repoData in self._repos.all():
+            tags = repoData.repoArgs.tags
+            if tags:
+                repoData.addTags(tags)
+                for parentRepoData in repoData.getParentRepoDatas():
+                    parentRepoData.addTags(tags)
 
     def _convertV1Args(self, root, mapper, mapperArgs):
         """Convert Old Butler RepositoryArgs (root, mapper, mapperArgs) to New Butler RepositoryArgs
@@ -1085,12 +1304,12 @@ class Butler:
         return defaultMapper
 
     def _assignDefaultMapper(self, defaultMapper):
-        for repoData in self._repos.all().values():
+        for repoData in self._repos.all():
             if repoData.cfg.mapper is None and (repoData.isNewRepository or repoData.isV1Repository):
                 if defaultMapper is None:
                     raise RuntimeError(
                         "No mapper specified for %s and no default mapper could be determined." %
-                        repoData.args)
+                        repoData.repoArgs)
                 repoData.cfg.mapper = defaultMapper
 
     @staticmethod
@@ -1116,7 +1335,7 @@ class Butler:
         # it can have '@' as the first character (if not it's okay, we will add it) or not at all.
         atLoc = alias.rfind('@')
         if atLoc == -1:
-            alias = "@" + str(alias)
+            alias = "@" + alias
         elif atLoc > 0:
             raise RuntimeError("Badly formatted alias string: %s" % (alias,))
 
@@ -1125,12 +1344,30 @@ class Butler:
             raise RuntimeError("Badly formatted type string: %s" % (datasetType))
 
         # verify that the alias keyword does not start with another alias keyword,
-        # and vice versa
-        for key in self.datasetTypeAliasDict:
+        # and vice versa. The existing aliases do not overlap, so in sorted order an alias that the new one
+        # starts with is just before it, and an alias that starts with the new one is just after it.
+        aliases = self._getSortedAliases()
+        idx = bisect.bisect_left(aliases, alias)
+        for key in aliases[max(idx - 1, 0):idx + 1]:
             if key.startswith(alias) or alias.startswith(key):
                 raise RuntimeError("Alias: %s overlaps with existing alias: %s" % (alias, key))
 
         self.datasetTypeAliasDict[alias] = datasetType
+        aliases.insert(idx, alias)
+        self._datasetTypeAliasCache.clear()
+        self._datasetTypeAliasPattern = None
+
+    def _getSortedAliases(self):
+        """Get the sorted list of the alias keywords in datasetTypeAliasDict, for `defineAlias`.
+
+        The list is kept by defineAlias, and is made again if the alias dict was replaced or changed
+        directly.
+        """
+        if (self._sortedAliasesDict is not self.datasetTypeAliasDict
+                or len(self._sortedAliases) != len(self.datasetTypeAliasDict)):
+            self._sortedAliases = sorted(self.datasetTypeAliasDict)
+            self._sortedAliasesDict = self.datasetTypeAliasDict
+        return self._sortedAliases
 
     def getKeys(self, datasetType=None, level=None, tag=None):
         """Get the valid data id keys at or above the given level of hierarchy for the dataset type or the
@@ -1159,7 +1396,7 @@ class Butler:
         keys = None
         tag = setify(tag)
         for repoData in self._repos.inputs():
-            if not tag or len(tag.intersection(repoData.tags)) > 0:
+            if not tag or not tag.isdisjoint(repoData.tags):
                 keys = repoData.repo.getKeys(datasetType, level)
                 # An empty dict is a valid "found" condition for keys. The only value for keys that should
                 # cause the search to continue is None
@@ -1183,8 +1420,8 @@ class Butler:
         """
         datasetTypes = set()
         tag = setify(tag)
-        for repoData in self._repos.outputs() + self._repos.inputs():
-            if not tag or len(tag.intersection(repoData.tags)) > 0:
+        for repoData in itertools.chain(self._repos.outputs(), self._repos.inputs()):
+            if not tag or not tag.isdisjoint(repoData.tags):
                 datasetTypes = datasetTypes.union(
                     repoData.repo.mappers()[0].getDatasetTypes())
         return datasetTypes
@@ -1211,13 +1448,12 @@ class Butler:
         """
 
         datasetType = self._resolveDatasetTypeAlias(datasetType)
-        dataId = DataId(dataId)
-        dataId.update(**rest)
+        dataId = self._makeDataId(dataId, rest, copy=False)
         format = sequencify(format)
 
         tuples = None
         for repoData in self._repos.inputs():
-            if not dataId.tag or len(dataId.tag.intersection(repoData.tags)) > 0:
+            if not dataId.tag or not dataId.tag.isdisjoint(repoData.tags):
                 tuples = repoData.repo.queryMetadata(datasetType, format, dataId)
                 if tuples:
                     break
@@ -1226,6 +1462,11 @@ class Butler:
             return []
 
         if len(format) == 1:
+            # Usually every item is a 1-tuple; only check each item if one of them is not.
+            try:
+                return [x[0] for x in tuples]
+            except TypeError:
+                pass
             ret = []
             for x in tuples:
                 try:
@@ -1256,8 +1497,7 @@ class Butler:
             True if the dataset exists or is non-file-based.
         """
         datasetType = self._resolveDatasetTypeAlias(datasetType)
-        dataId = DataId(dataId)
-        dataId.update(**rest)
+        dataId = self._makeDataId(dataId, rest)
         locations = self._locate(datasetType, dataId, write=write)
         if not write:  # when write=False, locations is not a sequence
             if locations is None:
@@ -1284,7 +1524,7 @@ class Butler:
                     return False
         return True
 
-    def _locate(self, datasetType, dataId, write):
+    def _locate(self, datasetType, dataId, write, dataIdKey=None, mapMemo=None):
         """Get one or more ButlerLocations and/or ButlercComposites.
 
         Parameters
@@ -1300,35 +1540,70 @@ class Butler:
             True if this is a search to write an object. False if it is a search to read an object. This
             affects what type (an object or a container) is returned.
 
+        dataIdKey : tuple, optional
+            The result of `_dataIdCacheKey` for dataId, if the caller has it (i.e. when locating a component).
+
+        mapMemo : dict, optional
+            The results of mapping a datasetType in a repository so far in this search, keyed by the id of the
+            RepoData and the datasetType. It is shared with the searches for components, so that a component
+            is mapped in each repository once even when the composite is found in more than one repository.
+
         Returns
         -------
         If write is False, will return either a single object or None. If write is True, will return a list
         (which may be empty)
+
+        Notes
+        -----
+        When reading, ButlerLocations that were found (and that do not use a bypass function) are cached by
+        datasetType and dataId, so that lookups of the same dataset do not map it in each repository again.
+        A cached location is only used while it still exists, and the cache is cleared by `put`.
         """
+        cacheKey = None
+        if not write:
+            if dataIdKey is None:
+                dataIdKey = self._dataIdCacheKey(dataId)
+            if dataIdKey is not None:
+                cacheKey = (datasetType, dataIdKey)
+        if cacheKey is not None:
+            location = self._locationCache.get(cacheKey)
+            if location is not None:
+                if location.repository.exists(location):
+                    self._locationCache.move_to_end(cacheKey)
+                    return location
+                del self._locationCache[cacheKey]
         repos = self._repos.outputs() if write else self._repos.inputs()
         locations = []
+        # a dotted datasetType is "baseType.componentName[.more components]"; partition instead of split so
+        # that the common, undotted, case does not allocate a list.
+        baseType, _, components = datasetType.partition('.')
+        baseBypassName = "bypass_" + baseType
+        if mapMemo is None:
+            mapMemo = {}
         for repoData in repos:
             # enforce dataId & repository tags when reading:
-            if not write and dataId.tag and len(dataId.tag.intersection(repoData.tags)) == 0:
+            if not write and dataId.tag and dataId.tag.isdisjoint(repoData.tags):
                 continue
-            components = datasetType.split('.')
-            datasetType = components[0]
-            components = components[1:]
+            memoKey = (id(repoData), baseType)
             try:
-                location = repoData.repo.map(datasetType, dataId, write=write)
-            except NoResults:
-                continue
+                location = mapMemo[memoKey]
+            except KeyError:
+                try:
+                    location = repoData.repo.map(baseType, dataId, write=write)
+                except NoResults:
+                    location = None
+                mapMemo[memoKey] = location
             if location is None:
                 continue
-            location.datasetType = datasetType  # todo is there a better way than monkey patching here?
-            if len(components) > 0:
+            location.datasetType = baseType  # todo is there a better way than monkey patching here?
+            if components:
                 if not isinstance(location, ButlerComposite):
                     raise RuntimeError("The location for a dotted datasetType must be a composite.")
-                # replace the first component name with the datasetType
-                components[0] = location.componentInfo[components[0]].datasetType
-                # join components back into a dot-delimited string
-                datasetType = '.'.join(components)
-                location = self._locate(datasetType, dataId, write)
+                # replace the first component name with the datasetType and join the components back into a
+                # dot-delimited string
+                componentName, dot, moreComponents = components.partition('.')
+                componentType = location.componentInfo[componentName].datasetType + dot + moreComponents
+                location = self._locate(componentType, dataId, write, dataIdKey, mapMemo)
                 # if a component location is not found, we can not continue with this repo, move to next repo.
                 if location is None:
                     break
@@ -1341,8 +1616,12 @@ class Butler:
                     # in the bypass attribute of the location. The bypass function may fail for any reason,
                     # the most common case being that a file does not exist. If it raises an exception
                     # indicating such, we ignore the bypass function and proceed as though it does not exist.
-                    if hasattr(location.mapper, "bypass_" + location.datasetType):
-                        bypass = self._getBypassFunc(location, dataId)
+                    bypassName = (baseBypassName if location.datasetType == baseType
+                                  else "bypass_" + location.datasetType)
+                    bypassFunc = _findBypassFunc(location.mapper, location.datasetType, bypassName)
+                    hasBypass = bypassFunc is not None
+                    if hasBypass:
+                        bypass = self._getBypassFunc(location, dataId, bypassFunc)
                         try:
                             bypass = bypass()
                             location.bypass = bypass
@@ -1353,8 +1632,11 @@ class Butler:
                     # If a location was found but the location does not exist, keep looking in input
                     # repositories (the registry may have had enough data for a lookup even thought the object
                     # exists in a different repository.)
-                    if (isinstance(location, ButlerComposite) or hasattr(location, 'bypass')
-                            or location.repository.exists(location)):
+                    if isinstance(location, ButlerComposite) or hasattr(location, 'bypass'):
+                        return location
+                    if location.repository.exists(location):
+                        if cacheKey is not None and not hasBypass:
+                            self._cacheLocation(cacheKey, location)
                         return location
                 else:
                     try:
@@ -1366,12 +1648,30 @@ class Butler:
         return locations
 
     @staticmethod
-    def _getBypassFunc(location, dataId):
+    def _dataIdCacheKey(dataId):
+        """Get the part of the location cache key for a dataId, or None if the dataId has values that can not
+        be used in a key."""
+        try:
+            return (frozenset(dataId.items()), frozenset(dataId.tag) if dataId.tag else _NO_TAGS)
+        except TypeError:
+            return None
+
+    def _cacheLocation(self, cacheKey, location):
+        """Add a read location to the location cache, evicting the least recently used location if the cache
+        is full."""
+        self._locationCache[cacheKey] = location
+        self._locationCache.move_to_end(cacheKey)
+        while len(self._locationCache) > _LOCATION_CACHE_SIZE:
+            self._locationCache.popitem(last=False)
+
+    @staticmethod
+    def _getBypassFunc(location, dataId, bypassFunc=None):
         pythonType = location.getPythonType()
         if pythonType is not None:
             if isinstance(pythonType, str):
                 pythonType = doImport(pythonType)
-        bypassFunc = getattr(location.mapper, "bypass_" + location.datasetType)
+        if bypassFunc is None:
+            bypassFunc = getattr(location.mapper, "bypass_" + location.datasetType)
         return lambda: bypassFunc(location.datasetType, pythonType, location, dataId)
 
     def get(self, datasetType, dataId=None, immediate=True, **rest):
@@ -1393,9 +1693,25 @@ class Butler:
             An object retrieved from the dataset (or a proxy for one).
         """
         datasetType = self._resolveDatasetTypeAlias(datasetType)
-        dataId = DataId(dataId)
-        dataId.update(**rest)
+        dataId = self._makeDataId(dataId, rest)
+        return self._getResolved(datasetType, dataId, immediate)
+
+    def _getResolved(self, datasetType, dataId, immediate):
+        """Retrieve a dataset, see `get`.
+
+        Parameters
+        ----------
+        datasetType - string
+            The type of dataset to retrieve, with any aliases already resolved.
+        dataId - DataId
+            The data id. It is not copied, the caller should not modify it afterwards.
+        immediate - bool
+            If False use a proxy for delayed loading.
 
+        Returns
+        -------
+            An object retrieved from the dataset (or a proxy for one).
+        """
         location = self._locate(datasetType, dataId, write=False)
         if location is None:
             raise NoResults("No locations for get:", datasetType, dataId)
@@ -1435,10 +1751,29 @@ class Butler:
         **rest
             Keyword arguments for the data id.
         """
+        if not self._repos.outputs():
+            raise NoResults("No locations for put:", datasetType, dataId)
         datasetType = self._resolveDatasetTypeAlias(datasetType)
-        dataId = DataId(dataId)
-        dataId.update(**rest)
+        dataId = self._makeDataId(dataId, rest, copy=False)
 
+        # A dataset written now may hide a dataset in a parent repository that a cached location points to.
+        self._locationCache.clear()
+        self._putResolved(obj, datasetType, dataId, doBackup)
+
+    def _putResolved(self, obj, datasetType, dataId, doBackup):
+        """Persist a dataset, see `put`.
+
+        Parameters
+        ----------
+        obj -
+            The object to persist.
+        datasetType - string
+            The type of dataset to persist, with any aliases already resolved.
+        dataId - DataId
+            The data id.
+        doBackup - bool
+            If True, rename existing instead of overwriting.
+        """
         locations = self._locate(datasetType, dataId, write=True)
         if not locations:
             raise NoResults("No locations for put:", datasetType, dataId)
@@ -1446,14 +1781,71 @@ class Butler:
             if isinstance(location, ButlerComposite):
                 disassembler = location.disassembler if location.disassembler else genericDisassembler
                 disassembler(obj=obj, dataId=location.dataId, componentInfo=location.componentInfo)
+                componentDataId = self._makeDataId(location.dataId, {}, copy=False)
                 for name, info in location.componentInfo.items():
                     if not info.inputOnly:
-                        self.put(info.obj, info.datasetType, location.dataId, doBackup=doBackup)
+                        self._putResolved(info.obj, self._resolveDatasetTypeAlias(info.datasetType),
+                                          componentDataId, doBackup)
             else:
                 if doBackup:
                     location.getRepository().backup(location.datasetType, dataId)
                 location.getRepository().write(location, obj)
 
+    def getAll(self, datasetType, dataIds, immediate=True):
+        """Retrieves a dataset for each of several input collection data ids.
+
+        This is the same as calling `get` for each data id, except that the dataset type alias is only
+        resolved once.
+
+        Parameters
+        ----------
+        datasetType - string
+            The type of dataset to retrieve.
+        dataIds - iterable of dict
+            The data ids.
+        immediate - bool
+            If False use a proxy for delayed loading.
+
+        Returns
+        -------
+            A list of the objects retrieved from the datasets (or proxies for them), in the order of dataIds.
+        """
+        datasetType = self._resolveDatasetTypeAlias(datasetType)
+        return [self._getResolved(datasetType, self._makeDataId(dataId, {}), immediate) for dataId in dataIds]
+
+    def putAll(self, objs, datasetType, dataIds, doBackup=False):
+        """Persists a dataset for each of several output collection data ids.
+
+        This is the same as calling `put` for each object and data id, except that the dataset type alias is
+        only resolved once.
+
+        Parameters
+        ----------
+        objs - iterable
+            The objects to persist.
+        datasetType - string
+            The type of dataset to persist.
+        dataIds - iterable of dict
+            The data ids, one for each object in objs.
+        doBackup - bool
+            If True, rename existing instead of overwriting.
+            WARNING: Setting doBackup=True is not safe for parallel processing, as it may be subject to race
+            conditions.
+        """
+        objs = list(objs)
+        dataIds = list(dataIds)
+        if len(objs) != len(dataIds):
+            raise RuntimeError("putAll needs one data id for each object, got {} objects and {} data ids"
+                               .format(len(objs), len(dataIds)))
+        if not dataIds:
+            return
+        if not self._repos.outputs():
+            raise NoResults("No locations for put:", datasetType, dataIds[0])
+        datasetType = self._resolveDatasetTypeAlias(datasetType)
+        self._locationCache.clear()
+        for obj, dataId in zip(objs, dataIds):
+            self._putResolved(obj, datasetType, self._makeDataId(dataId, {}, copy=False), doBackup)
+
     def subset(self, datasetType, level=None, dataId={}, **rest):
         """Return complete dataIds for a dataset type that match a partial (or empty) dataId.
 
@@ -1558,8 +1950,7 @@ class Butler:
            URI for dataset.
         """
         datasetType = self._resolveDatasetTypeAlias(datasetType)
-        dataId = DataId(dataId)
-        dataId.update(**rest)
+        dataId = self._makeDataId(dataId, rest)
         locations = self._locate(datasetType, dataId, write=write)
         if locations is None:
             raise NoResults("No locations for getUri: ", datasetType, dataId)
@@ -1596,13 +1987,17 @@ class Butler:
         self.log.debug("Starting read from %s", location)
 
         if isinstance(location, ButlerComposite):
+            # The components are read with the same dataId; make it once instead of once per component (as
+            # in _locate, where the same dataId is mapped in each repository).
+            dataId = DataId(location.dataId)
             for name, componentInfo in location.componentInfo.items():
+                datasetType = self._resolveDatasetTypeAlias(componentInfo.datasetType)
                 if componentInfo.subset:
-                    subset = self.subset(datasetType=componentInfo.datasetType, dataId=location.dataId)
-                    componentInfo.obj = [obj.get() for obj in subset]
+                    subset = self.subset(datasetType=datasetType, dataId=location.dataId)
+                    componentInfo.obj = [self._getResolved(datasetType, DataId(dataRef.dataId),
+                                                           immediate=True) for dataRef in subset]
                 else:
-                    obj = self.get(componentInfo.datasetType, location.dataId, immediate=True)
-                    componentInfo.obj = obj
+                    componentInfo.obj = self._getResolved(datasetType, dataId, immediate=True)
                 assembler = location.assembler or genericAssembler
             results = assembler(dataId=location.dataId, componentInfo=location.componentInfo,
                                 cls=location.python)
@@ -1618,6 +2013,33 @@ class Butler:
         ret = (_unreduce, (self._initArgs, self.datasetTypeAliasDict))
         return ret
 
+    @staticmethod
+    def _makeDataId(dataId, rest, copy=True):
+        """Make the DataId to use for a Butler call from its dataId argument and keyword arguments.
+
+        Parameters
+        ----------
+        dataId : dict, DataId, or None
+            The dataId argument.
+        rest : dict
+            The keyword arguments for the data id.
+        copy : bool, optional
+            If False, a DataId passed without keyword arguments is used as it is instead of being copied.
+            Butler does not modify the DataIds it is called with, but mappers may keep the DataId in the
+            locations they make and read locations are cached (see `_locate`), so this is only safe for calls
+            that do not keep any read location.
+
+        Returns
+        -------
+        DataId
+            The DataId to use.
+        """
+        if not copy and not rest and isinstance(dataId, DataId):
+            return dataId
+        dataId = DataId(dataId)
+        dataId.update(**rest)
+        return dataId
+
     def _resolveDatasetTypeAlias(self, datasetType):
         """Replaces all the known alias keywords in the given string with the alias value.
 
@@ -1631,16 +2053,36 @@ class Butler:
         datasetType - string
             The de-aliased string
         """
-        for key in self.datasetTypeAliasDict:
-            # if all aliases have been replaced, bail out
-            if datasetType.find('@') == -1:
-                break
-            datasetType = datasetType.replace(key, self.datasetTypeAliasDict[key])
+        if '@' not in datasetType:
+            return datasetType
+        # Resolved aliases are cached until defineAlias is called or the alias dict is replaced. The alias
+        # dict may also be changed directly; if its aliases are not the ones the cache and the pattern were
+        # made from, both are made again.
+        if (self._datasetTypeAliasCacheDict is not self.datasetTypeAliasDict
+                or self._datasetTypeAliasSnapshot != self.datasetTypeAliasDict):
+            self._datasetTypeAliasCache = {}
+            self._datasetTypeAliasCacheDict = self.datasetTypeAliasDict
+            self._datasetTypeAliasSnapshot = dict(self.datasetTypeAliasDict)
+            self._datasetTypeAliasPattern = None
+        resolved = self._datasetTypeAliasCache.get(datasetType)
+        if resolved is not None:
+            return resolved
+        aliased = datasetType
+
+        if self.datasetTypeAliasDict:
+            # Replace all the aliases in one pass; longer aliases are tried first, in case aliases that
+            # overlap were added to the dict without defineAlias.
+            if self._datasetTypeAliasPattern is None:
+                self._datasetTypeAliasPattern = re.compile('|'.join(
+                    re.escape(key) for key in sorted(self._datasetTypeAliasSnapshot, key=len, reverse=True)))
+            datasetType = self._datasetTypeAliasPattern.sub(
+                lambda match: self._datasetTypeAliasSnapshot[match.group(0)], datasetType)
 
         # If an alias specifier can not be resolved then throw.
-        if datasetType.find('@') != -1:
+        if '@' in datasetType:
             raise RuntimeError("Unresolvable alias specifier in datasetType: %s" % (datasetType))
 
+        self._datasetTypeAliasCache[aliased] = datasetType
         return datasetType
 
 
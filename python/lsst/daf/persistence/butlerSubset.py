@@ -55,12 +55,19 @@ class ButlerSubset:
 
     __iter__(self)
 
+    getAll(self, datasetType=None, immediate=True)
+
+    putAll(self, objs, datasetType=None, doBackup=False)
+
     """
 
     GENERATION = 2
     """This is a Generation 2 ButlerSubset.
     """
 
+    __slots__ = ('butler', 'datasetType', 'dataId', 'level', '_cache', '_fmt', '_idTuples', '_subLevels',
+                 '_levelKeys', '_defaultSubLevel', '_defaultSubLevelFound')
+
     def __init__(self, butler, datasetType, level, dataId):
         """
         Create a ButlerSubset by querying a butler for data ids matching a
@@ -76,13 +83,23 @@ class ButlerSubset:
         self.butler = butler
         self.datasetType = datasetType
         self.dataId = DataId(dataId)
-        self.cache = []
         self.level = level
+        # The data ids are made from the queryMetadata results (self._idTuples) when they are first needed;
+        # until then iterating over the subset makes them one at a time, without keeping them.
+        self._cache = None
+        self._fmt = None
+        self._idTuples = None
+        self._subLevels = None
+        # None is a valid default sublevel, so whether it was looked up yet is kept separately.
+        self._defaultSubLevel = None
+        self._defaultSubLevelFound = False
 
         keys = self.butler.getKeys(datasetType, level, tag=dataId.tag)
+        self._levelKeys = keys
         if keys is None:
+            self._cache = []
             return
-        fmt = list(keys.keys())
+        fmt = tuple(keys.keys())
 
         # Don't query if we already have a complete dataId
         completeId = True
@@ -91,18 +108,90 @@ class ButlerSubset:
                 completeId = False
                 break
         if completeId:
-            self.cache.append(dataId)
+            self._cache = [dataId]
             return
 
-        idTuples = butler.queryMetadata(self.datasetType, fmt, self.dataId)
+        self._fmt = fmt
+        self._idTuples = butler.queryMetadata(self.datasetType, fmt, self.dataId)
+
+    @property
+    def cache(self):
+        """The list of data ids (dicts) in the ButlerSubset, made on first use."""
+        if self._cache is None:
+            self._cache = list(self._makeDataIds())
+            self._idTuples = None
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache):
+        self._cache = cache
+        self._idTuples = None
+
+    def _makeDataIds(self):
+        """Generate the data ids of the queryMetadata results.
+
+        Each data id is a copy of the (plain dict) partial data id, updated with the values of the keys in
+        fmt. queryMetadata returns values instead of 1-tuples when there is only one key. The common shapes,
+        one key and/or an empty partial data id, are built without the steps they do not need.
+        """
+        fmt = self._fmt
+        baseId = self.dataId.data
+        idTuples = self._idTuples
+        if len(fmt) == 1:
+            key = fmt[0]
+            if not baseId:
+                return ({key: value} for value in idTuples)
+            return self._makeDataIdsWithKey(baseId, key, idTuples)
+        if not baseId:
+            return (dict(zip(fmt, idTuple)) for idTuple in idTuples)
+        return self._makeDataIdsWithKeys(baseId, fmt, idTuples)
+
+    @staticmethod
+    def _makeDataIdsWithKey(baseId, key, values):
+        """Generate copies of baseId with key set to each of values."""
+        for value in values:
+            tempId = baseId.copy()
+            tempId[key] = value
+            yield tempId
+
+    @staticmethod
+    def _makeDataIdsWithKeys(baseId, fmt, idTuples):
+        """Generate copies of baseId updated with the keys in fmt and the values of each of idTuples."""
         for idTuple in idTuples:
-            tempId = dict(self.dataId)
-            if len(fmt) == 1:
-                tempId[fmt[0]] = idTuple
-            else:
-                for i in range(len(fmt)):
-                    tempId[fmt[i]] = idTuple[i]
-            self.cache.append(tempId)
+            tempId = baseId.copy()
+            tempId.update(zip(fmt, idTuple))
+            yield tempId
+
+    def _getSubLevels(self):
+        """Get the keys of the levels of the hierarchy lower than the level of the ButlerSubset; they are
+        looked up once, and shared by all the ButlerDataRefs of the ButlerSubset.
+
+        @returns (frozenset)  strings with level keys."""
+        if self._subLevels is None:
+            allKeys = self.butler.getKeys(self.datasetType, tag=self.dataId.tag)
+            self._subLevels = frozenset(allKeys.keys()) - frozenset(self._levelKeys.keys())
+        return self._subLevels
+
+    def _getDefaultSubLevel(self):
+        """Get the default level below the level of the ButlerSubset; it is looked up in the mappers once,
+        and shared by all the ButlerDataRefs of the ButlerSubset.
+
+        As currently implemented, the default sublevels for all the
+        repositories used by this Butler instance must match for the Butler to
+        be able to select a default sublevel.
+
+        @returns (str) the default sublevel, or None if there is no lower level.
+        """
+        if not self._defaultSubLevelFound:
+            levelSet = set()
+            for repoData in self.butler._repos.all():
+                levelSet.add(repoData.repo._mapper.getDefaultSubLevel(self.level))
+            if len(levelSet) > 1:
+                raise RuntimeError(
+                    "Support for multiple levels not implemented.")
+            self._defaultSubLevel = levelSet.pop()
+            self._defaultSubLevelFound = True
+        return self._defaultSubLevel
 
     def __repr__(self):
         return "ButlerSubset(butler=%s, datasetType=%s, dataId=%s, cache=%s, level=%s)" % (
@@ -115,26 +204,69 @@ class ButlerSubset:
         @returns (int)
         """
 
-        return len(self.cache)
+        if self._cache is None:
+            return len(self._idTuples)
+        return len(self._cache)
 
     def __iter__(self):
         """
         Iterator over the ButlerDataRefs in the ButlerSubset.
 
-        @returns (ButlerIterator)
+        @returns (generator of ButlerDataRef)
+        """
+
+        for dataId in self._iterDataIds():
+            yield ButlerDataRef(self, dataId)
+
+    def _iterDataIds(self):
+        """Iterate over the data ids in the ButlerSubset, without making the cache if it is not made yet."""
+        if self._cache is None:
+            return self._makeDataIds()
+        return iter(self._cache)
+
+    def getAll(self, datasetType=None, immediate=True):
+        """
+        Retrieve a dataset of the given type (or the type used when creating
+        the ButlerSubset, if None) for every ButlerDataRef in the ButlerSubset.
+
+        @param datasetType (str)  dataset type to retrieve.
+        @param immediate (bool)   if False use a proxy for delayed loading.
+        @returns list of the objects, in the order of iteration.
         """
+        if datasetType is None:
+            datasetType = self.datasetType
+        return self.butler.getAll(datasetType, self._iterDataIds(), immediate=immediate)
 
-        return ButlerSubsetIterator(self)
+    def putAll(self, objs, datasetType=None, doBackup=False):
+        """
+        Persist a dataset of the given type (or the type used when creating
+        the ButlerSubset, if None) for every ButlerDataRef in the ButlerSubset.
+
+        @param objs               objects to persist, one per ButlerDataRef in iteration order.
+        @param datasetType (str)  dataset type to persist.
+        @param doBackup           if True, rename existing instead of overwriting
+
+        WARNING: Setting doBackup=True is not safe for parallel processing, as it
+        may be subject to race conditions.
+        """
+        if datasetType is None:
+            datasetType = self.datasetType
+        self.butler.putAll(objs, datasetType, self._iterDataIds(), doBackup=doBackup)
 
 
 class ButlerSubsetIterator:
     """
     An iterator over the ButlerDataRefs in a ButlerSubset.
+
+    ButlerSubset.__iter__ is a generator and does not use this class; it is
+    kept for code that creates one directly.
     """
 
+    __slots__ = ('butlerSubset', 'iter')
+
     def __init__(self, butlerSubset):
         self.butlerSubset = butlerSubset
-        self.iter = iter(butlerSubset.cache)
+        self.iter = butlerSubset._iterDataIds()
 
     def __iter__(self):
         return self
@@ -177,6 +309,8 @@ class ButlerDataRef:
     """This is a Generation 2 DataRef.
     """
 
+    __slots__ = ('butlerSubset', 'dataId')
+
     def __init__(self, butlerSubset, dataId):
         """
         For internal use only.  ButlerDataRefs should only be created by
@@ -198,9 +332,10 @@ class ButlerDataRef:
         @param **rest             keyword arguments with data identifiers
         @returns object corresponding to the given dataset type.
         """
+        butlerSubset = self.butlerSubset
         if datasetType is None:
-            datasetType = self.butlerSubset.datasetType
-        return self.butlerSubset.butler.get(datasetType, self.dataId, **rest)
+            datasetType = butlerSubset.datasetType
+        return butlerSubset.butler.get(datasetType, self.dataId, **rest)
 
     def put(self, obj, datasetType=None, doBackup=False, **rest):
         """
@@ -216,9 +351,10 @@ class ButlerDataRef:
         may be subject to race conditions.
         """
 
+        butlerSubset = self.butlerSubset
         if datasetType is None:
-            datasetType = self.butlerSubset.datasetType
-        self.butlerSubset.butler.put(obj, datasetType, self.dataId, doBackup=doBackup, **rest)
+            datasetType = butlerSubset.datasetType
+        butlerSubset.butler.put(obj, datasetType, self.dataId, doBackup=doBackup, **rest)
 
     def getUri(self, datasetType=None, write=False, **rest):
         """Return the URL for a dataset
@@ -246,9 +382,10 @@ class ButlerDataRef:
            URI for dataset
         """
 
+        butlerSubset = self.butlerSubset
         if datasetType is None:
-            datasetType = self.butlerSubset.datasetType
-        return self.butlerSubset.butler.getUri(datasetType, self.dataId, write=write, **rest)
+            datasetType = butlerSubset.datasetType
+        return butlerSubset.butler.getUri(datasetType, self.dataId, write=write, **rest)
 
     def subLevels(self):
         """
@@ -257,16 +394,7 @@ class ButlerDataRef:
 
         @returns (iterable)  list of strings with level keys."""
 
-        return set(
-            self.butlerSubset.butler.getKeys(
-                self.butlerSubset.datasetType,
-                tag=self.butlerSubset.dataId.tag).keys()
-        ) - set(
-            self.butlerSubset.butler.getKeys(
-                self.butlerSubset.datasetType,
-                self.butlerSubset.level,
-                tag=self.butlerSubset.dataId.tag).keys()
-        )
+        return set(self.butlerSubset._getSubLevels())
 
     def subItems(self, level=None):
         """
@@ -285,14 +413,7 @@ class ButlerDataRef:
         """
 
         if level is None:
-            levelSet = set()
-            for repoData in self.butlerSubset.butler._repos.all():
-                levelSet.add(repoData.repo._mapper.getDefaultSubLevel(
-                             self.butlerSubset.level))
-            if len(levelSet) > 1:
-                raise RuntimeError(
-                    "Support for multiple levels not implemented.")
-            level = levelSet.pop()
+            level = self.butlerSubset._getDefaultSubLevel()
             if level is None:
                 return ()
         return self.butlerSubset.butler.subset(self.butlerSubset.datasetType,
@@ -308,9 +429,10 @@ class ButlerDataRef:
         @param **rest            keywords arguments with data identifiers
         @returns bool
         """
+        butlerSubset = self.butlerSubset
         if datasetType is None:
-            datasetType = self.butlerSubset.datasetType
-        return self.butlerSubset.butler.datasetExists(
+            datasetType = butlerSubset.datasetType
+        return butlerSubset.butler.datasetExists(
             datasetType, self.dataId, write=write, **rest)
 
     def getButler(self):
@@ -22,6 +22,8 @@
 
 import copy
 import errno
+import hashlib
+import json
 import yaml
 import os
 import urllib
@@ -35,8 +37,11 @@ try:
     # We need to use Unsafe because obs packages do not register
     # constructors but rely on python object syntax.
     Loader = yaml.UnsafeLoader
+    # The LibYAML based equivalent of Loader, if PyYAML was built with LibYAML. It is several times faster.
+    CLoader = getattr(yaml, 'CUnsafeLoader', None)
 except AttributeError:
     Loader = yaml.Loader
+    CLoader = getattr(yaml, 'CLoader', None)
 
 
 def _write(butlerLocation, cfg):
@@ -87,10 +92,36 @@ def _write(butlerLocation, cfg):
                 cfgToWrite = setRoot(existingCfg, loc)
             except ParentsMismatch as e:
                 raise RuntimeError("Can not extend existing repository cfg because: {}".format(e))
-        yaml.dump(cfgToWrite, f)
+        data = yaml.dump(cfgToWrite)
+        f.write(data)
+        # while the yaml file is still locked, replace (or remove) its json copy to match what was written.
+        _writeJson(loc, data, cfgToWrite)
         cfg.dirty = False
 
 
+def _load(data):
+    """Load a RepositoryCfg from a yaml string, with CLoader if it is available.
+
+    Tags that are registered only with Loader (e.g. by yaml.YAMLObject subclasses) are unknown to CLoader;
+    in that case the pure python Loader is used.
+
+    Parameters
+    ----------
+    data : string
+        The yaml to load.
+
+    Returns
+    -------
+    The loaded object (a RepositoryCfg instance) or None
+    """
+    if CLoader is not None:
+        try:
+            return yaml.load(data, Loader=CLoader)
+        except yaml.constructor.ConstructorError:
+            pass
+    return yaml.load(data, Loader=Loader)
+
+
 def _doRead(fileObject, uri):
     """Get a persisted RepositoryCfg from an open file object.
 
@@ -105,7 +136,24 @@ def _doRead(fileObject, uri):
     -------
     A RepositoryCfg instance or None
     """
-    repositoryCfg = yaml.load(fileObject, Loader=Loader)
+    return _loadCfg(fileObject.read(), uri)
+
+
+def _loadCfg(data, uri):
+    """Get a RepositoryCfg from the contents of a repositoryCfg.yaml file.
+
+    Parameters
+    ----------
+    data : string
+        the contents of the file.
+    uri : string
+        path to the repositoryCfg
+
+    Returns
+    -------
+    A RepositoryCfg instance or None
+    """
+    repositoryCfg = _load(data)
     if repositoryCfg is not None:
         if repositoryCfg.root is None:
             repositoryCfg.root = uri
@@ -130,15 +178,136 @@ def _read(butlerLocation):
     IOError
         Raised if no repositoryCfg exists at the location.
     """
-    repositoryCfg = None
     loc = butlerLocation.storage.root
     fileLoc = os.path.join(loc, butlerLocation.getLocations()[0])
     try:
         with safeFileIo.SafeLockedFileForRead(fileLoc) as f:
-            repositoryCfg = _doRead(f, loc)
+            data = f.read()
     except IOError as e:
         if e.errno != errno.ENOENT:  # ENOENT is 'No such file or directory'
             raise
+        return None
+    repositoryCfg = _readJson(fileLoc, data, loc)
+    if repositoryCfg is None:
+        repositoryCfg = _loadCfg(data, loc)
+    return repositoryCfg
+
+
+# A json copy of each repositoryCfg.yaml is written next to it when the yaml file is written, because json is
+# much faster to load than yaml. It is only written for cfgs that are exactly representable in json, and it is
+# only used while the digest of the yaml file's contents is the one recorded in the json file, so it is never
+# used after the yaml file is changed by other means. Reading a repository never writes to it.
+
+def _jsonPath(yamlLoc):
+    """Get the path to the json copy of a repositoryCfg.yaml file."""
+    return os.path.splitext(yamlLoc)[0] + '.json'
+
+
+def _yamlDigest(data):
+    """Get the digest of the contents of a repositoryCfg.yaml file, as stored in the json copy."""
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def _isJsonExact(obj):
+    """Test if an object is made only of types that will be the same after a round trip through json."""
+    if obj is None or type(obj) in (bool, int, float, str):
+        return True
+    if type(obj) is list:
+        return all(_isJsonExact(item) for item in obj)
+    if type(obj) is dict:
+        return all(type(key) is str and _isJsonExact(val) for key, val in obj.items())
+    return False
+
+
+def _cfgToJson(cfg, root):
+    """Get a dict that can be written to json for a RepositoryCfg, or None if the cfg can not be represented
+    exactly in json (e.g. if the mapper is a class object).
+
+    The parents are recorded in their persisted (normalized) form.
+    """
+    if not (cfg.mapper is None or type(cfg.mapper) is str) or cfg.policy is not None:
+        return None
+    if not _isJsonExact(cfg.mapperArgs):
+        return None
+    parents = []
+    for parent in cfg._parents:
+        if isinstance(parent, RepositoryCfg):
+            parent = _cfgToJson(parent, parent.root)
+            if parent is None:
+                return None
+            parents.append({'cfg': parent})
+        elif type(parent) is str:
+            parents.append(parent)
+        else:
+            return None
+    return {'root': root, 'mapper': cfg.mapper, 'mapperArgs': cfg.mapperArgs, 'parents': parents}
+
+
+def _cfgFromJson(d):
+    """Make a RepositoryCfg from a dict made by _cfgToJson."""
+    cfg = RepositoryCfg(root=d['root'], mapper=d['mapper'], mapperArgs=d['mapperArgs'], parents=[],
+                        policy=None)
+    cfg._parents = [_cfgFromJson(parent['cfg']) if isinstance(parent, dict) else parent
+                    for parent in d['parents']]
+    cfg.dirty = False
+    return cfg
+
+
+def _writeJson(yamlLoc, data, cfg):
+    """Write the json copy of a repositoryCfg.yaml file that was just written, replacing any previous copy; if
+    the cfg can not be represented exactly in json the previous copy is removed instead.
+
+    The copy is written to a temporary file that is renamed into place, so it is never read partly written.
+    Failure to write it is ignored; the yaml file is still read without it.
+
+    Parameters
+    ----------
+    yamlLoc : string
+        Path to the repositoryCfg.yaml file.
+    data : string
+        The contents that were written to the repositoryCfg.yaml file.
+    cfg : RepositoryCfg
+        The RepositoryCfg that was written to the repositoryCfg.yaml file (root is None if it is the location
+        of the file).
+    """
+    jsonLoc = _jsonPath(yamlLoc)
+    d = _cfgToJson(cfg, cfg.root)
+    try:
+        if d is None:
+            os.remove(jsonLoc)
+        else:
+            with safeFileIo.SafeFile(jsonLoc) as f:
+                json.dump({'yamlDigest': _yamlDigest(data), 'cfg': d}, f)
+    except OSError:
+        pass
+
+
+def _readJson(yamlLoc, data, uri):
+    """Read the json copy of a repositoryCfg.yaml file.
+
+    Parameters
+    ----------
+    yamlLoc : string
+        Path to the repositoryCfg.yaml file.
+    data : string
+        The contents of the repositoryCfg.yaml file.
+    uri : string
+        Path to the repository, used as the root of the cfg if none is recorded.
+
+    Returns
+    -------
+    A RepositoryCfg instance, or None if there is not a json copy of the yaml file's current contents.
+    """
+    try:
+        with open(_jsonPath(yamlLoc), 'r') as f:
+            d = json.load(f)
+        if d['yamlDigest'] != _yamlDigest(data):
+            return None
+        repositoryCfg = _cfgFromJson(d['cfg'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    if repositoryCfg.root is None:
+        repositoryCfg.root = uri
     return repositoryCfg
 
 
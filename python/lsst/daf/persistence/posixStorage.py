@@ -59,6 +59,10 @@ class PosixStorage(StorageInterface):
         specified by uri then NoRepositroyAtRoot is raised.
     """
 
+    # mapper classes found by getMapperClass in legacy _mapper files, keyed by the path to the _mapper file.
+    # Values are (mtime, mapper class).
+    _mapperClassCache = {}
+
     def __init__(self, uri, create):
         self.log = Log.getLogger("daf.persistence.butler")
         self.root = self._pathFromURI(uri)
@@ -145,6 +149,26 @@ class PosixStorage(StorageInterface):
                                   datasetType=None)
         return storage.read(location)
 
+    @staticmethod
+    def getRepositoryCfgStamp(uri):
+        """Get the modification time and size of a persisted RepositoryCfg.
+
+        Parameters
+        ----------
+        uri : URI or path to a RepositoryCfg
+            The location of the RepositoryCfg.
+
+        Returns
+        -------
+        tuple or None
+            (mtime in ns, size) of the repositoryCfg.yaml file, or None if it does not exist.
+        """
+        try:
+            st = os.stat(os.path.join(PosixStorage._pathFromURI(uri), 'repositoryCfg.yaml'))
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
     @staticmethod
     def putRepositoryCfg(cfg, loc=None):
         storage = Storage.makeFromURI(cfg.root if loc is None else loc, create=True)
@@ -198,6 +222,12 @@ class PosixStorage(StorageInterface):
         if mapperFile is not None:
             mapperFile = os.path.join(basePath, mapperFile)
 
+            # Use the previously found class if the _mapper file has not changed since it was read.
+            mtime = os.stat(mapperFile).st_mtime_ns
+            cached = PosixStorage._mapperClassCache.get(mapperFile, None)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
             # Read the name of the mapper class and instantiate it
             with open(mapperFile, "r") as f:
                 mapperName = f.readline().strip()
@@ -206,7 +236,9 @@ class PosixStorage(StorageInterface):
                 raise RuntimeError("Unqualified mapper name %s in %s" %
                                    (mapperName, mapperFile))
             pkg = importlib.import_module(".".join(components[:-1]))
-            return getattr(pkg, components[-1])
+            mapperClass = getattr(pkg, components[-1])
+            PosixStorage._mapperClassCache[mapperFile] = (mtime, mapperClass)
+            return mapperClass
 
         return None
 
@@ -84,6 +84,21 @@ class RepositoryArgs:
             self.__class__.__name__, self.root, self._cfgRoot, self._mapper, self.mapperArgs, self.tags,
             self.mode, self.policy)
 
+    def copy(self):
+        """Get a copy of this RepositoryArgs that can be modified without changing this one.
+
+        The mapper and policy are shared with the copy; mapperArgs and tags are copied.
+
+        Returns
+        -------
+        RepositoryArgs
+            The copy.
+        """
+        ret = copy.copy(self)
+        ret.mapperArgs = copy.copy(self.mapperArgs)
+        ret.tags = set(self.tags)
+        return ret
+
     @property
     def mapper(self):
         return self._mapper
@@ -25,10 +25,16 @@
 # -*- python -*-
 
 import copy
+import sys
 import yaml
 from . import iterify, doImport, Storage, ParentsMismatch
 
 
+def _intern(value):
+    """Intern value if it is a string, so that the roots and mapper names of many cfgs share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
 class RepositoryCfg(yaml.YAMLObject):
     """RepositoryCfg stores the configuration of a repository. Its contents are persisted to the repository
     when the repository is created in persistent storage. Thereafter the the RepositoryCfg should not change.
@@ -52,8 +58,8 @@ class RepositoryCfg(yaml.YAMLObject):
     yaml_tag = u"!RepositoryCfg_v1"
 
     def __init__(self, root, mapper, mapperArgs, parents, policy):
-        self._root = root
-        self._mapper = mapper
+        self._root = _intern(root)
+        self._mapper = _intern(mapper)
         self._mapperArgs = {} if mapperArgs is None else mapperArgs
         self._parents = []
         self.addParents(iterify(parents))
@@ -188,7 +194,7 @@ class RepositoryCfg(yaml.YAMLObject):
     def root(self, root):
         if root is not None and self._root is not None:
             raise RuntimeError("Explicity clear root (set to None) before changing the value of root.")
-        self._root = root
+        self._root = _intern(root)
 
     @property
     def mapper(self):
@@ -199,7 +205,7 @@ class RepositoryCfg(yaml.YAMLObject):
         if self._mapper is not None:
             raise RuntimeError("Should not set mapper over previous not-None value.")
         self.dirty = True
-        self._mapper = mapper
+        self._mapper = _intern(mapper)
 
     @property
     def mapperArgs(self):
@@ -321,6 +327,12 @@ try:
     loaderList.append(yaml.UnsafeLoader)
 except AttributeError:
     pass
+# LibYAML based loaders, only available if PyYAML was built with LibYAML.
+for loaderName in ('CLoader', 'CUnsafeLoader'):
+    try:
+        loaderList.append(getattr(yaml, loaderName))
+    except AttributeError:
+        pass
 
 for loader in loaderList:
     yaml.add_constructor(u"!RepositoryCfg_v1", RepositoryCfg.v1Constructor, Loader=loader)
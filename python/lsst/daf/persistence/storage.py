@@ -22,6 +22,9 @@
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
 
+import collections
+import copy
+import threading
 import urllib.parse
 from . import NoRepositroyAtRoot
 
@@ -31,6 +34,14 @@ class Storage:
 
     storages = {}
 
+    # RepositoryCfgs shared by all Storage instances in this process, keyed by uri. Values are
+    # (stamp, cfg) where stamp is provided by the StorageInterface subclass and is used to detect that the
+    # persisted cfg has changed since it was cached.
+    _repositoryCfgCache = collections.OrderedDict()
+    _repositoryCfgCacheSize = 128
+    # Butler may read several cfgs concurrently, see `Butler._getRepositoryCfgs`.
+    _repositoryCfgCacheLock = threading.Lock()
+
     def __init__(self):
         self.repositoryCfgs = {}
 
@@ -75,22 +86,75 @@ class Storage:
 
         RepositoryCfgs are not supposed to change once they are created so this
         should not lead to stale data.
+
+        Cfgs are also cached across Storage instances (i.e. across Butlers) in
+        this process if the storage can provide a stamp for the persisted cfg
+        (see `StorageInterface.getRepositoryCfgStamp`); the cached cfg is used
+        only while the stamp is unchanged. A copy of the cached cfg is returned
+        so that callers may modify it.
         """
         cfg = self.repositoryCfgs.get(uri, None)
         if cfg:
             return cfg
         parseRes = urllib.parse.urlparse(uri)
         if parseRes.scheme in Storage.storages:
-            cfg = Storage.storages[parseRes.scheme].getRepositoryCfg(uri)
+            storage = Storage.storages[parseRes.scheme]
+            stamp = storage.getRepositoryCfgStamp(uri)
+            cached = None
+            if stamp is not None:
+                with Storage._repositoryCfgCacheLock:
+                    cached = Storage._repositoryCfgCache.get(uri, None)
+                    if cached is not None and cached[0] == stamp:
+                        Storage._repositoryCfgCache.move_to_end(uri)
+            if cached is not None and cached[0] == stamp:
+                cfg = copy.deepcopy(cached[1])
+            else:
+                cfg = storage.getRepositoryCfg(uri)
+                if cfg and stamp is not None:
+                    Storage._cacheRepositoryCfg(uri, stamp, cfg)
             if cfg:
                 self.repositoryCfgs[uri] = cfg
         else:
             raise RuntimeError("No storage registered for scheme %s" % parseRes.scheme)
         return cfg
 
+    @staticmethod
+    def _cacheRepositoryCfg(uri, stamp, cfg):
+        """Add a copy of cfg to the process-wide RepositoryCfg cache, evicting the least recently used cfg if
+        the cache is full."""
+        cfg = copy.deepcopy(cfg)
+        with Storage._repositoryCfgCacheLock:
+            Storage._repositoryCfgCache[uri] = (stamp, cfg)
+            Storage._repositoryCfgCache.move_to_end(uri)
+            while len(Storage._repositoryCfgCache) > Storage._repositoryCfgCacheSize:
+                Storage._repositoryCfgCache.popitem(last=False)
+
+    @staticmethod
+    def getRepositoryCfgStamp(uri):
+        """Get a value that changes whenever the persisted RepositoryCfg at uri changes.
+
+        See `StorageInterface.getRepositoryCfgStamp`.
+
+        Parameters
+        ----------
+        uri : string
+            URI to the location of the RepositoryCfg.
+
+        Returns
+        -------
+        A hashable value, or None if a stamp can not be determined.
+        """
+        parseRes = urllib.parse.urlparse(uri)
+        storage = Storage.storages.get(parseRes.scheme, None)
+        if storage:
+            return storage.getRepositoryCfgStamp(uri)
+        return None
+
     @staticmethod
     def putRepositoryCfg(cfg, uri):
         """Write a RepositoryCfg object to a location described by uri"""
+        with Storage._repositoryCfgCacheLock:
+            Storage._repositoryCfgCache.pop(uri, None)
         ret = None
         parseRes = urllib.parse.urlparse(uri)
         if parseRes.scheme in Storage.storages:
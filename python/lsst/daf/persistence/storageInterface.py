@@ -304,6 +304,23 @@ class StorageInterface:
         A RepositoryCfg instance or None
         """
 
+    # Optional: Only needs to be implemented if the storage can cheaply tell when a persisted RepositoryCfg
+    # has changed. If it returns None the RepositoryCfg will not be cached across Storage instances.
+    @classmethod
+    def getRepositoryCfgStamp(cls, uri):
+        """Get a value that changes whenever the persisted RepositoryCfg at uri changes.
+
+        Parameters
+        ----------
+        uri : URI or path to a RepositoryCfg
+            The location of the RepositoryCfg.
+
+        Returns
+        -------
+        A hashable value, or None if a stamp can not be determined.
+        """
+        return None
+
     @classmethod
     @abstractmethod
     def putRepositoryCfg(cls, cfg, loc=None):
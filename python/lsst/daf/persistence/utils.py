@@ -22,6 +22,7 @@
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
 from collections.abc import Sequence, Set, Mapping
+import functools
 
 
 # -*- python -*-
@@ -101,8 +102,12 @@ def setify(x):
     return x
 
 
+@functools.lru_cache(maxsize=None)
 def doImport(pythonType):
-    """Import a python object given an importable string"""
+    """Import a python object given an importable string
+
+    Results are cached, so that repeated lookups of the same string (e.g. the mapper of each repository of
+    each Butler) do not repeat the import machinery."""
     try:
         if not isinstance(pythonType, str):
             raise TypeError("Unhandled type of pythonType, val:%s" % pythonType)
@@ -115,6 +115,29 @@ class ButlerTest(unittest.TestCase):
                                'mapper': 'lsst.daf.persistence.test.EmptyTestMapper'})
             lsst.daf.persistence.deprecation.always_warn = current
 
+    def testFindBypassFunc(self):
+        """Test that bypass functions added to a mapper class after it was first searched, and ones provided
+        by __getattr__, are found."""
+        findBypassFunc = lsst.daf.persistence.butler._findBypassFunc
+
+        class BypassMapper(dpTest.EmptyTestMapper):
+            pass
+
+        mapper = BypassMapper()
+        self.assertIsNone(findBypassFunc(mapper, 'raw', 'bypass_raw'))
+        BypassMapper.bypass_raw = lambda self, datasetType, pythonType, location, dataId: 'raw'
+        self.assertEqual(findBypassFunc(mapper, 'raw', 'bypass_raw')(None, None, None, None), 'raw')
+
+        class GetattrMapper(dpTest.EmptyTestMapper):
+            def __getattr__(self, name):
+                if name.startswith('bypass_'):
+                    return lambda datasetType, pythonType, location, dataId: name
+                raise AttributeError(name)
+
+        mapper = GetattrMapper()
+        self.assertEqual(findBypassFunc(mapper, 'calexp', 'bypass_calexp')(None, None, None, None),
+                         'bypass_calexp')
+
 
 class MemoryTester(lsst.utils.tests.MemoryTestCase):
     pass
@@ -123,6 +123,29 @@ class ButlerTestCase(unittest.TestCase):
         with self.assertRaises(RuntimeError):
             self.butler.getKeys('@bar')
 
+    def testResolveAfterDefineAlias(self):
+        """Test that resolved aliases are not stale after an alias is defined, the value of an alias is
+        changed in the alias dict, or the alias dict is replaced."""
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@foo'), 'raw')
+        with self.assertRaises(RuntimeError):
+            self.butler._resolveDatasetTypeAlias('@bar')
+        self.butler.defineAlias('bar', 'calexp')
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@bar_md'), 'calexp_md')
+        self.butler.datasetTypeAliasDict['@bar'] = 'src'
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@bar_md'), 'src_md')
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@foo'), 'raw')
+        self.butler.datasetTypeAliasDict = {'@foo': 'calexp'}
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@foo'), 'calexp')
+        self.butler.datasetTypeAliasDict['@foo'] = 'raw'
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@foo'), 'raw')
+
+    def testResolveAfterAliasDictKeyAdded(self):
+        """Test that an alias added to the alias dict directly, after an alias was resolved, is resolved."""
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@foo'), 'raw')
+        self.butler.datasetTypeAliasDict['@new'] = 'x'
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@new'), 'x')
+        self.assertEqual(self.butler._resolveDatasetTypeAlias('@foo_md'), 'raw_md')
+
     def testOverlappingAlias(self):
         self.butler = dafPersist.Butler(inputs=[], outputs=[])
 
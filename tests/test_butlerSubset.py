@@ -152,6 +152,36 @@ class ButlerSubsetTestCase(unittest.TestCase):
         for fileName in inputList:
             os.unlink(os.path.join(self.tmpRoot, fileName))
 
+    def testIterationWithoutCache(self):
+        """Test that iterating over a subset gives the same data ids whether or not its cache was made."""
+        butler = dafPersist.Butler(
+            outputs={'mode': 'rw', 'root': self.tmpRoot, 'mapper': ImgMapper})
+        ButlerSubsetTestCase.registerAliases(butler)
+        subset = butler.subset(self.calexpTypeName, skyTile=6)
+        self.assertEqual(len(subset), 4)
+        dataIds = [ref.dataId for ref in subset]
+        self.assertIsNone(subset._cache)
+        self.assertEqual(subset.cache, dataIds)
+        self.assertEqual([ref.dataId for ref in subset], dataIds)
+        self.assertEqual(len(subset), 4)
+
+    def testGetAll(self):
+        """Test that ButlerSubset.getAll gets the same objects as ButlerDataRef.get, in iteration order."""
+        butler = dafPersist.Butler(
+            outputs={'mode': 'rw', 'root': self.tmpRoot, 'mapper': ImgMapper})
+        ButlerSubsetTestCase.registerAliases(butler)
+        inputList = ["calexp_v123456_R1,2_S2,1.pickle",
+                     "calexp_v123456_R1,2_S2,2.pickle",
+                     "calexp_v654321_R1,3_S1,1.pickle",
+                     "calexp_v654321_R1,3_S1,2.pickle"]
+        for fileName in inputList:
+            with open(os.path.join(self.tmpRoot, fileName), "wb") as f:
+                pickle.dump(fileName, f)
+        subset = butler.subset(self.calexpTypeName, skyTile=6)
+        objs = subset.getAll()
+        self.assertEqual(objs, [ref.get() for ref in subset])
+        self.assertEqual(set(objs), set(inputList))
+
     def testNonexistentValue(self):
         butler = dafPersist.Butler(
             outputs={'mode': 'rw', 'root': self.tmpRoot, 'mapper': ImgMapper})
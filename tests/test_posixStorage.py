@@ -142,6 +142,62 @@ class TestGetLocalFile(unittest.TestCase):
         f.close()
 
 
+class TestRepositoryCfgCache(unittest.TestCase):
+    """A test case for the RepositoryCfg cache shared between Storage instances."""
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp(dir=ROOT, prefix='TestRepositoryCfgCache-')
+
+    def tearDown(self):
+        if os.path.exists(self.testDir):
+            shutil.rmtree(self.testDir)
+
+    def testCachedCfgIsCopied(self):
+        """Test that a cfg read by two Storage instances is equal but not the same object."""
+        cfg = dp.RepositoryCfg(root=self.testDir, mapper='foo.Mapper', mapperArgs=None, parents=None,
+                               policy=None)
+        dp.Storage.putRepositoryCfg(cfg, self.testDir)
+        cfgA = dp.Storage().getRepositoryCfg(self.testDir)
+        cfgB = dp.Storage().getRepositoryCfg(self.testDir)
+        self.assertEqual(cfgA, cfg)
+        self.assertEqual(cfgA, cfgB)
+        self.assertIsNot(cfgA, cfgB)
+
+    def testReplacedCfgIsReread(self):
+        """Test that a cfg that is replaced on disk is not served from the cache."""
+        cfg = dp.RepositoryCfg(root=self.testDir, mapper='foo.Mapper', mapperArgs=None, parents=None,
+                               policy=None)
+        dp.Storage.putRepositoryCfg(cfg, self.testDir)
+        self.assertEqual(dp.Storage().getRepositoryCfg(self.testDir).mapper, 'foo.Mapper')
+        shutil.rmtree(self.testDir)
+        self.assertIsNone(dp.Storage().getRepositoryCfg(self.testDir))
+        cfg = dp.RepositoryCfg(root=self.testDir, mapper='bar.Mapper', mapperArgs=None, parents=None,
+                               policy=None)
+        dp.Storage.putRepositoryCfg(cfg, self.testDir)
+        self.assertEqual(dp.Storage().getRepositoryCfg(self.testDir).mapper, 'bar.Mapper')
+
+    def testJsonCopyOfCfg(self):
+        """Test that writing a cfg writes a json copy of it that is read back the same, that the json copy is
+        not used after the yaml file is replaced, and that reading a cfg does not write a json copy."""
+        yamlPath = os.path.join(self.testDir, 'repositoryCfg.yaml')
+        jsonPath = os.path.join(self.testDir, 'repositoryCfg.json')
+        cfg = dp.RepositoryCfg(root=self.testDir, mapper='foo.Mapper', mapperArgs={'a': 1}, parents=None,
+                               policy=None)
+        dp.PosixStorage.putRepositoryCfg(cfg, self.testDir)
+        self.assertTrue(os.path.exists(jsonPath))
+        self.assertEqual(dp.PosixStorage.getRepositoryCfg(self.testDir), cfg)
+        # Replace the yaml file with one of the same size, without going through putRepositoryCfg.
+        with open(yamlPath) as f:
+            data = f.read()
+        self.assertIn('foo.Mapper', data)
+        with open(yamlPath, 'w') as f:
+            f.write(data.replace('foo.Mapper', 'bar.Mapper'))
+        self.assertEqual(dp.PosixStorage.getRepositoryCfg(self.testDir).mapper, 'bar.Mapper')
+        os.remove(jsonPath)
+        self.assertEqual(dp.PosixStorage.getRepositoryCfg(self.testDir).mapper, 'bar.Mapper')
+        self.assertFalse(os.path.exists(jsonPath))
+
+
 class MemoryTester(lsst.utils.tests.MemoryTestCase):
     pass
 
@@ -395,6 +395,12 @@ class TestDiamondPattern(unittest.TestCase):
 
         self.assertEqual(1, len(butlerD._repos.outputs()))
         self.assertEqual(os.path.dirname(butlerD._repos.outputs()[0].parentRegistry.root), repoARoot)
+        # the common parent should appear only once in the depth-first list of parents.
+        parents = butlerD._repos.outputs()[0].getParentRepoDatas()
+        self.assertEqual([p.cfg.root for p in parents], [repoBRoot, repoARoot, repoCRoot])
+        # and the Butler should only have one RepoData for it.
+        self.assertEqual([r.cfg.root for r in butlerD._repos.all()],
+                         [repoDRoot, repoBRoot, repoARoot, repoCRoot])
 
 
 class TestMasking(unittest.TestCase):
@@ -918,6 +924,43 @@ class TestParentRepository(unittest.TestCase):
         self.assertEqual(tables, [('repoB', )])
 
 
+class TestSharedRepository(unittest.TestCase):
+    """A test to verify that Butlers share the Repository of an input but not of an output."""
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp(dir=ROOT, prefix="TestSharedRepository-")
+
+    def tearDown(self):
+        if os.path.exists(self.testDir):
+            shutil.rmtree(self.testDir, True)
+
+    def test(self):
+        repoADir = os.path.join(self.testDir, 'repoA')
+        repoBDir = os.path.join(self.testDir, 'repoB')
+        repoCDir = os.path.join(self.testDir, 'repoC')
+        butler = dp.Butler(outputs={'root': repoADir, 'mapper': ParentRepoTestMapper})
+        del butler
+        butlerB = dp.Butler(inputs=repoADir, outputs=repoBDir)
+        butlerC = dp.Butler(inputs=repoADir, outputs=repoCDir)
+        self.assertIs(butlerB._repos.inputs()[0].repo, butlerC._repos.inputs()[0].repo)
+        self.assertIsNot(butlerB._repos.outputs()[0].repo, butlerC._repos.outputs()[0].repo)
+        butlerB2 = dp.Butler(inputs=repoADir, outputs=repoBDir)
+        self.assertIsNot(butlerB._repos.outputs()[0].repo, butlerB2._repos.outputs()[0].repo)
+
+    def testMapperInstance(self):
+        """Test that the Repository of an input that is given a mapper instance is not shared."""
+        repoADir = os.path.join(self.testDir, 'repoA')
+        butler = dp.Butler(outputs={'root': repoADir, 'mapper': ParentRepoTestMapper})
+        del butler
+        butlerB = dp.Butler(inputs=repoADir)
+        mapper = ParentRepoTestMapper(parentRegistry=None, repositoryCfg=dp.RepositoryCfg(
+            root=repoADir, mapper=ParentRepoTestMapper, mapperArgs=None, parents=None, policy=None))
+        butlerC = dp.Butler(inputs=dp.RepositoryArgs(root=repoADir, mapper=mapper))
+        self.assertIsNot(butlerB._repos.inputs()[0].repo, butlerC._repos.inputs()[0].repo)
+        butlerD = dp.Butler(inputs=repoADir)
+        self.assertIs(butlerB._repos.inputs()[0].repo, butlerD._repos.inputs()[0].repo)
+
+
 class TestOldButlerParent(unittest.TestCase):
     """A test to verify that when a parent is an old butler repo that it still gets loaded correctly,
     including mapperArgs."""
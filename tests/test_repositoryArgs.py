@@ -161,6 +161,31 @@ class ParseRootURI(unittest.TestCase):
             self.fail("Butler init raised a runtime error loading input %s" % uri)
 
 
+class ButlerDoesNotModifyArgs(unittest.TestCase):
+    """Test that Butler init does not change the RepositoryArgs that are passed in."""
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp(dir=ROOT, prefix="ButlerDoesNotModifyArgs-")
+
+    def tearDown(self):
+        if os.path.exists(self.testDir):
+            shutil.rmtree(self.testDir)
+
+    def test(self):
+        args = dp.RepositoryArgs(root=self.testDir, mapper='lsst.daf.persistence.Mapper',
+                                 mapperArgs={'foo': 1})
+        butler = dp.Butler(outputs=args)
+        self.assertIsNone(args.mode)
+        self.assertEqual(args.mapperArgs, {'foo': 1})
+        del butler
+        args = dp.RepositoryArgs(root=self.testDir, tags='bar')
+        butler = dp.Butler(inputs=args)
+        self.assertIsNone(args.mode)
+        self.assertIsNone(args.mapper)
+        self.assertEqual(args.tags, set(['bar']))
+        del butler
+
+
 class MemoryTester(lsst.utils.tests.MemoryTestCase):
     pass
 